@@ -1,9 +1,19 @@
+import io                             # Import io to wrap uploaded bytes as a file-like object
+import hashlib                        # Import hashlib for a digest of the uploaded file (cache key)
+import re                             # Import re for compiling the "< LOR" pattern
 import streamlit as st                # Import Streamlit for building the web app
 import pandas as pd                   # Import pandas for data manipulation
 import numpy as np                    # Import numpy for numerical operations
 import seaborn as sns                 # Import seaborn for statistical data visualization
 import plotly.express as px           # Import plotly express for interactive plots
+import matplotlib.pyplot as plt       # Import matplotlib for building the rasterised pairplot grid
+import datashader as ds               # Import datashader for rasterising large scatter panels
+import datashader.transfer_functions as tf  # Import datashader transfer functions for shading
+from matplotlib.colors import to_hex  # Import to_hex to convert seaborn colours for datashader
+from matplotlib.patches import Patch  # Import Patch for building the pairplot legend
 from datetime import datetime         # Import datetime for date operations
+from concurrent.futures import ThreadPoolExecutor  # Import ThreadPoolExecutor for processing sheets in parallel
+from itertools import repeat          # Import repeat to pass the shared site dtype to every sheet
 
 # Set the app configuration
 st.set_page_config(layout="wide", page_title="Brine Data Visualiser")   # Set Streamlit app layout and title
@@ -41,7 +51,7 @@ st.sidebar.markdown("""                                                 # Add ma
 5. **Pairplot: Side-by-side Comparison**:
    - Select two sheets to compare using the dropdown menu.
    - The app will identify common parameters between the two sheets.
-   - Use the **"Select parameters for pairplot"** option to choose specific parameters for comparison.
+   - Use the **"Select parameters for pairplot"** option to choose specific parameters for comparison, then click **"Generate pairplot"**.
    - The pairplot will display scatter plots for all combinations of the selected parameters, color-coded by site.
 
 6. **General Notes**:
@@ -50,48 +60,158 @@ st.sidebar.markdown("""                                                 # Add ma
             
 """)
 
+# Pattern for values below the limit of reporting, e.g. "<5" or "< 0.5"
+LOR_PATTERN = re.compile(r"<\s*\d+\.?\d*")
+
+# Number of uploads (or sheet pairs) each cached loader keeps in memory
+MAX_CACHED_UPLOADS = 3
+
+# Number of points above which scatter plots are rendered with WebGL instead of SVG
+WEBGL_THRESHOLD = 5000
+
+# Function to pick the plotly render mode for a DataFrame
+def render_mode_for(df):                                    # Define a function to choose SVG or WebGL rendering
+    return "webgl" if len(df) >= WEBGL_THRESHOLD else "svg" # Use WebGL for large frames, SVG for small ones
+
+# Number of pairplot rows from which panels are rasterised with datashader instead of seaborn
+DATASHADER_THRESHOLD = 2000
+
+# Function to build a corner pairplot with datashader-rasterised panels
+def datashader_pairplot(pivot_pair, params, height=2.5):    # Define a function to draw a pairplot for large data
+    data = pivot_pair.copy()                                # Copy so the Site column can be made categorical
+    data["Site"] = pd.Categorical(data["Site"].astype(str)) # Datashader needs a categorical column to colour by
+    site_list = list(data["Site"].cat.categories)           # Get the sites in category order
+    colors = [to_hex(c) for c in sns.color_palette(n_colors=len(site_list))]  # Use the seaborn palette
+    color_key = dict(zip(site_list, colors))                # Map each site to its colour
+
+    ranges = {}                                             # Axis range of each parameter, shared by its row and column
+    for param in params:
+        low, high = data[param].min(), data[param].max()    # Get the data range
+        ranges[param] = (low - 0.5, high + 0.5) if low == high else (low, high)  # Pad a constant range
+
+    k = len(params)                                         # Number of selected parameters
+    fig, axes = plt.subplots(k, k, figsize=(height * k, height * k), squeeze=False)  # Create a K x K grid of axes
+    for i, y_col in enumerate(params):                      # Loop through rows (Y parameter)
+        for j, x_col in enumerate(params):                  # Loop through columns (X parameter)
+            ax = axes[i, j]
+            if j > i:                                       # Keep the lower triangle only (corner plot)
+                ax.set_visible(False)
+                continue
+            if i == j:                                      # On the diagonal draw per-site histograms
+                for site in site_list:
+                    ax.hist(data.loc[data["Site"] == site, x_col], bins=50, range=ranges[x_col],
+                            histtype="step", color=color_key[site])
+                ax.set_xlim(ranges[x_col])                  # Line up with the scatter panels in the same column
+                ax.set_ylabel("Count" if j == 0 else "")    # The diagonal's Y axis is a count, not a parameter
+            else:                                           # Off the diagonal rasterise the scatter panel
+                x_range, y_range = ranges[x_col], ranges[y_col]  # Get the X and Y data ranges
+                canvas = ds.Canvas(plot_width=400, plot_height=400, x_range=x_range, y_range=y_range)  # Create canvas
+                agg = canvas.points(data, x_col, y_col, ds.count_cat("Site"))  # Count points per pixel per site
+                img = tf.spread(tf.shade(agg, color_key=color_key), px=1)      # Shade and enlarge points
+                ax.imshow(img.to_pil(), extent=(*x_range, *y_range), aspect="auto")  # Draw the image on the axes
+                ax.set_ylabel(y_col if j == 0 else "")      # Label Y axes on the first column only
+            ax.set_xlabel(x_col if i == k - 1 else "")      # Label X axes on the bottom row only
+
+    fig.legend(handles=[Patch(color=color_key[site], label=site) for site in site_list],
+               title="Site", loc="upper right")              # Add a legend for the sites
+    fig.tight_layout()                                      # Tidy spacing between panels
+    return fig                                              # Return the figure
+
+# Function to format dates as "MM-YY" labels
+def format_month_year(dates):                               # Define a function to build the "MM-YY" date labels
+    if dates.empty:                                         # np.char.zfill fails on an empty array
+        return np.array([], dtype="U5")                     # Return no labels
+    months = np.char.zfill(dates.dt.month.to_numpy().astype("U2"), 2)        # Two-digit month strings
+    years = np.char.zfill((dates.dt.year % 100).to_numpy().astype("U2"), 2)  # Two-digit year strings
+    return np.char.add(np.char.add(months, "-"), years)     # Join them as "MM-YY"
+
 # Function to read and clean each sheet
-def process_sheet(df_raw, site_name):                       # Define a function to process each sheet of data
-    df = df_raw.copy()                                      # Make a copy of the raw DataFrame
-    df.columns = df.iloc[0]                                 # Set the first row as column headers
-    df = df.drop(df.index[0])                               # Drop the first row (now used as headers)
-    df = df.reset_index(drop=True)                          # Reset the index after dropping the row
+def process_sheet(df_raw, site_name, site_dtype):           # Define a function to process each sheet of data
+    df_raw.columns = df_raw.iloc[0]                         # Set the first row as column headers (no copy, the frame is ours)
+    df = df_raw.iloc[1:].reset_index(drop=True)             # Drop the first row (now used as headers) and reset the index
 
     df.rename(columns={df.columns[0]: "PARAMETER"}, inplace=True)   # Rename the first column to "PARAMETER"
     
     # Replace <x with 0, convert all to numeric
-    for col in df.columns[1:]:                              # Loop through all columns except "PARAMETER"
-        df[col] = df[col].astype(str).replace(r"<\s*\d+\.?\d*", "0", regex=True)  # Replace values like "<5" with "0"
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)              # Convert to numeric, fill NaN with 0
+    block = df.iloc[:, 1:].astype(object)                   # Select all columns except "PARAMETER"
+    num = block.apply(pd.to_numeric, errors='coerce')       # Convert the whole block to numeric in one pass
+    mask = num.isna() & block.notna()                       # Find cells that are present but not plain numbers
+    for i in np.flatnonzero(mask.any().to_numpy()):         # Loop only through columns holding such cells (e.g. "<5")
+        rows = mask.iloc[:, i].to_numpy()                   # Rows of those cells in this column
+        cells = block.iloc[rows, i].astype(str).str.replace(LOR_PATTERN, "0", regex=True)  # Replace values like "<5" with "0"
+        num.iloc[rows, i] = pd.to_numeric(cells, errors='coerce').to_numpy()  # Write the converted values back by position
+    num = num.fillna(0).astype(np.float32)                  # Fill remaining NaN with 0 and store as float32
+    num.insert(0, "PARAMETER", df["PARAMETER"])             # Put the "PARAMETER" column back in front
 
     # Melt the DataFrame to long format
-    df_long = df.melt(id_vars=["PARAMETER"], var_name="Sampling Date", value_name="Value")  # Convert to long format
+    df_long = num.melt(id_vars=["PARAMETER"], var_name="Sampling Date", value_name="Value")  # Convert to long format
     df_long["Sampling Date"] = pd.to_datetime(df_long["Sampling Date"], errors="coerce")    # Convert dates to datetime
     df_long = df_long.dropna(subset=["Sampling Date"])                                      # Drop rows with invalid dates
-    df_long["Date (MM-YY)"] = df_long["Sampling Date"].dt.strftime("%m-%y")                 # Add formatted date column
-    df_long["Site"] = site_name                                                             # Add site name column
+    df_long["Site"] = pd.Categorical([site_name] * len(df_long), dtype=site_dtype)          # Add site name column (shared categories)
 
     return df_long                                    # Return the cleaned and formatted DataFrame
 
-# File uploader
-uploaded_file = st.file_uploader("Upload spreadsheet (csv, xls, xlsx)", type=['csv', 'xls', 'xlsx'])  # File upload widget
-
-if uploaded_file:                                     # If a file is uploaded
-    if uploaded_file.name.endswith('.csv'):           # If the file is a CSV
-        df = pd.read_csv(uploaded_file, header=None)  # Read CSV without headers
-        sheet_names = ["Sheet1"]                      # Use a default sheet name
-        sheets = {"Sheet1": df}                       # Store in a dictionary
-    else:                                             # If the file is Excel
-        xls = pd.ExcelFile(uploaded_file)             # Read the Excel file
-        sheet_names = xls.sheet_names[:4]             # Get up to 4 sheet names
+# Function to read and process every sheet of an uploaded file (cached on the file digest)
+# Arguments starting with "_" are not hashed by Streamlit, so the bytes are only digested once per rerun
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_UPLOADS)
+def load_sheets(file_key, file_name, _file_bytes):          # Define a cached function keyed on the upload digest
+    if file_name.endswith('.csv'):                         # If the file is a CSV
+        try:
+            df = pd.read_csv(io.BytesIO(_file_bytes), header=None, engine='pyarrow', dtype_backend='pyarrow')  # Read CSV with the multithreaded pyarrow parser
+        except (ImportError, ValueError):                  # If pyarrow is missing or cannot parse this file
+            df = pd.read_csv(io.BytesIO(_file_bytes), header=None)  # Fall back to the default parser
+        sheets = {"Sheet1": df}                            # Store under a default sheet name
+    else:                                                  # If the file is Excel
+        xls = pd.ExcelFile(io.BytesIO(_file_bytes))        # Read the Excel file (pandas opens .xlsx with openpyxl in read-only mode)
+        sheet_names = xls.sheet_names[:4]                  # Get up to 4 sheet names
         sheets = {name: xls.parse(name, header=None) for name in sheet_names}  # Parse each sheet
 
-    processed_data = {}                               # Dictionary to hold processed data
-    for name, df in sheets.items():                   # Loop through each sheet
-        processed_data[name] = process_sheet(df, name) # Process and store each sheet
+    site_dtype = pd.CategoricalDtype(categories=list(sheets.keys()))  # One site dtype shared by every sheet
+    with ThreadPoolExecutor(max_workers=4) as executor:    # Process up to 4 sheets at the same time
+        processed = executor.map(process_sheet, sheets.values(), sheets.keys(), repeat(site_dtype))  # Process each sheet
+        return dict(zip(sheets.keys(), processed))         # Return the processed sheets by name
 
+# Function to combine the processed sheets into one DataFrame (cached on the file digest)
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_UPLOADS)
+def build_all_data(file_key, file_name, _file_bytes):      # Define a cached function keyed on the upload digest
+    processed_data = load_sheets(file_key, file_name, _file_bytes)  # Get the processed sheets (cached)
     all_data = pd.concat(processed_data.values(), ignore_index=True)   # Combine all sheets into one DataFrame
-    parameters = all_data['PARAMETER'].unique().tolist()               # Get unique parameter names
+    all_data['PARAMETER'] = pd.Categorical(all_data['PARAMETER'], categories=all_data['PARAMETER'].dropna().unique())  # Store parameter names as categories in order of appearance
+    all_data['Site'] = all_data['Site'].cat.remove_unused_categories()  # Drop sites whose sheet had no valid dates
+    parameters = list(all_data['PARAMETER'].cat.categories)  # Get unique parameter names
+    site_names = tuple(all_data['Site'].cat.categories)    # Get unique site names
+    return all_data, parameters, site_names                # Return combined data with its parameters and sites
+
+# Function to split the combined data into one DataFrame per (parameter, site) pair (cached on the file digest)
+# cache_resource returns the same dict on every rerun instead of unpickling hundreds of frames; callers only read it
+@st.cache_resource(show_spinner=False, max_entries=MAX_CACHED_UPLOADS)
+def split_data(file_key, file_name, _file_bytes):          # Define a cached function keyed on the upload digest
+    all_data = build_all_data(file_key, file_name, _file_bytes)[0]  # Get the combined data (cached)
+    return dict(tuple(all_data.groupby(['PARAMETER', 'Site'], observed=True)))  # Group once and store each part
+
+# Function to merge two processed sheets for the pairplot (cached on the file digest and sheet names)
+# cache_resource returns the same frame on every rerun instead of unpickling it; callers only read it
+@st.cache_resource(show_spinner=False, max_entries=MAX_CACHED_UPLOADS)
+def merge_sheets(file_key, file_name, sheet_a, sheet_b, _file_bytes):  # Define a cached function keyed on the upload and both sheets
+    processed_data = load_sheets(file_key, file_name, _file_bytes)  # Get the processed sheets (cached)
+    return pd.concat([processed_data[sheet_a], processed_data[sheet_b]])  # Merge both sheets
+
+# Function to gather the rows for the selected parameters and sites
+def select_data(parts, params, site_list, empty):          # Define a function to replace boolean-mask filtering
+    frames = [parts[(p, s)] for p in dict.fromkeys(params) for s in site_list if (p, s) in parts]  # Pick matching parts
+    return pd.concat(frames) if frames else empty          # Combine them, or return an empty frame if none match
+
+# File uploader
+uploaded_file = st.file_uploader("Upload spreadsheet (csv, xls, xlsx)", type=['csv', 'xls', 'xlsx'])  # File upload widget
+
+if uploaded_file:                                     # If a file is uploaded
+    file_bytes = uploaded_file.getvalue()             # Read the uploaded file contents
+    file_key = hashlib.md5(file_bytes).hexdigest()    # Digest the contents once (used as the cache key)
+    processed_data = load_sheets(file_key, uploaded_file.name, file_bytes)    # Get processed data for each sheet
+    sheet_names = list(processed_data.keys())                                 # Get the sheet names
+    all_data, parameters, site_names = build_all_data(file_key, uploaded_file.name, file_bytes)  # Get combined data, parameters and sites
+    parts = split_data(file_key, uploaded_file.name, file_bytes)              # Get the data split by parameter and site
+    no_data = all_data.iloc[:0]                                               # Empty frame used when nothing is selected
 
     # SCATTER PLOT
     st.subheader("Scatter Plot")                      # Add a subheader for scatter plot
@@ -102,13 +222,14 @@ if uploaded_file:                                     # If a file is uploaded
         param_y = st.selectbox("Y-axis parameter", parameters, key="scatter_y")   # Dropdown for Y-axis parameter
 
     # Add site selection for scatter plot
-    scatter_sites = st.multiselect("Select sites for scatter plot", all_data["Site"].unique(), default=all_data["Site"].unique())  # Site filter
-    scatter_df = all_data[(all_data['PARAMETER'].isin([param_x, param_y])) & (all_data["Site"].isin(scatter_sites))]               # Filter data
-    pivot_df = scatter_df.pivot_table(index=["Sampling Date", "Site"], columns="PARAMETER", values="Value").dropna()               # Pivot for plotting
+    scatter_sites = st.multiselect("Select sites for scatter plot", site_names, default=site_names)  # Site filter
+    scatter_df = select_data(parts, [param_x, param_y], scatter_sites, no_data)               # Filter data
+    pivot_df = scatter_df.groupby(["Sampling Date", "Site", "PARAMETER"], observed=True)["Value"].mean() \
+                         .unstack("PARAMETER").dropna(subset=[param_x, param_y])      # Pivot the two parameters for plotting
 
     fig_scatter = px.scatter(
         pivot_df, x=param_x, y=param_y, color=pivot_df.index.get_level_values("Site"),
-        title=f"{param_y} vs {param_x}"
+        title=f"{param_y} vs {param_x}", render_mode=render_mode_for(pivot_df)
     )                               # Create scatter plot
 
     # Update layout for axis lines, ticks, and bold fonts
@@ -137,10 +258,11 @@ if uploaded_file:                                     # If a file is uploaded
     selected_ts_params = st.multiselect("Select parameters to plot over time", parameters, default=parameters[:2], key="ts")  # Parameter selection
 
     # Add site selection for time series plot
-    ts_sites = st.multiselect("Select sites for time series plot", all_data["Site"].unique(), default=all_data["Site"].unique(), key="ts_sites")  # Site filter
-    ts_df = all_data[(all_data['PARAMETER'].isin(selected_ts_params)) & (all_data["Site"].isin(ts_sites))]   # Filter data
+    ts_sites = st.multiselect("Select sites for time series plot", site_names, default=site_names, key="ts_sites")  # Site filter
+    ts_df = select_data(parts, selected_ts_params, ts_sites, no_data)   # Filter data
     fig_ts = px.scatter(
-        ts_df, x="Sampling Date", y="Value", color="Site", symbol="PARAMETER", title="Time Series of Parameters"
+        ts_df, x="Sampling Date", y="Value", color="Site", symbol="PARAMETER", title="Time Series of Parameters",
+        render_mode=render_mode_for(ts_df)
     )  # Create plot
 
     fig_ts.update_layout(
@@ -166,16 +288,17 @@ if uploaded_file:                                     # If a file is uploaded
     ratio_params = st.multiselect("Select two parameters for ratio (A/B)", parameters, default=parameters[:2], key="ratio")       # Parameter selection
 
     # Add site selection for ratio time series plot
-    ratio_sites = st.multiselect("Select sites for ratio time series plot", all_data["Site"].unique(), default=all_data["Site"].unique(), key="ratio_sites")  # Site filter
+    ratio_sites = st.multiselect("Select sites for ratio time series plot", site_names, default=site_names, key="ratio_sites")  # Site filter
 
     if len(ratio_params) == 2:                                                             # If two parameters are selected
-        ratio_df = all_data[(all_data['PARAMETER'].isin(ratio_params)) & (all_data["Site"].isin(ratio_sites))]   # Filter data
-        pivot_ratio = ratio_df.pivot_table(index=["Sampling Date", "Date (MM-YY)", "Site"], columns="PARAMETER", values="Value").dropna()  # Pivot data
-        pivot_ratio['Ratio'] = pivot_ratio[ratio_params[0]] / pivot_ratio[ratio_params[1]]  # Calculate ratio
+        ratio_df = select_data(parts, ratio_params, ratio_sites, no_data)   # Filter data
+        ratio_df = ratio_df.assign(**{"Date (MM-YY)": format_month_year(ratio_df["Sampling Date"])})  # Add formatted date column for the selected rows only
+        pivot_ratio = ratio_df.groupby(["Sampling Date", "Date (MM-YY)", "Site", "PARAMETER"], observed=True)["Value"].mean().unstack("PARAMETER").dropna()  # Pivot data
+        pivot_ratio['Ratio'] = pivot_ratio[ratio_params[0]] / pivot_ratio[ratio_params[1]].replace(0, np.nan)  # Calculate ratio (NaN for a zero denominator)
 
         fig_ratio = px.scatter(
             pivot_ratio.reset_index(), x="Date (MM-YY)", y="Ratio", color="Site",
-            title=f"Ratio of {ratio_params[0]} / {ratio_params[1]}"
+            title=f"Ratio of {ratio_params[0]} / {ratio_params[1]}", render_mode=render_mode_for(pivot_ratio)
         )    # Create scatter plot for ratio
 
         fig_ratio.update_layout(
@@ -203,38 +326,49 @@ if uploaded_file:                                     # If a file is uploaded
     if len(sheet_pair) == 2:                                                                # If two sheets are selected
         pair1 = processed_data[sheet_pair[0]]                                               # Get first sheet data
         pair2 = processed_data[sheet_pair[1]]                                               # Get second sheet data
-        merged_pair = pd.concat([pair1, pair2])                                             # Merge both sheets
+        merged_pair = merge_sheets(file_key, uploaded_file.name, *sorted(sheet_pair), file_bytes)  # Merge both sheets (cached, order-independent)
 
         # Allow users to select specific parameters for comparison
-        common_params = list(set(pair1['PARAMETER']).intersection(pair2['PARAMETER']))      # Find common parameters
-        common_params.sort()  # Sort parameters alphabetically
-        selected_pair_params = st.multiselect("Select parameters for pairplot", common_params, default=common_params[:3])  # Parameter selection
-
-        if selected_pair_params:                                                            # If parameters are selected
+        common_params = np.intersect1d(pair1['PARAMETER'].dropna().unique(), pair2['PARAMETER'].dropna().unique()).tolist()  # Find common parameters (sorted)
+        pairplot_key = (uploaded_file.file_id, tuple(sheet_pair))                           # Identify this upload and sheet pair
+        with st.form("pairplot_form"):                                                      # Group the controls so the plot only updates on submit
+            selected_pair_params = st.multiselect("Select parameters for pairplot", common_params, default=common_params[:3])  # Parameter selection
+            if st.form_submit_button("Generate pairplot"):                                  # If the form is submitted
+                st.session_state["pairplot_submitted"] = pairplot_key                       # Remember which upload and sheets it was submitted for
+
+        if st.session_state.get("pairplot_submitted") != pairplot_key:                      # If the form has not been submitted for these yet
+            st.info("Select parameters and click \"Generate pairplot\" to draw the pairplot.")  # Tell the user how to draw it
+        elif selected_pair_params:                                                          # If parameters are selected
             # Filter data for selected parameters
             filtered_pair = merged_pair[merged_pair['PARAMETER'].isin(selected_pair_params)] # Filter merged data
-            pivot_pair = filtered_pair.pivot_table(index=["Sampling Date", "Site"], 
-                                                   columns="PARAMETER", values="Value").dropna().reset_index()  # Pivot data
+            pivot_pair = filtered_pair.groupby(["Sampling Date", "Site", "PARAMETER"], observed=True)["Value"].mean() \
+                                      .unstack("PARAMETER").dropna().reset_index()  # Pivot data
 
             st.write("Generating pairplot (this may take a few seconds)...")                # Notify user
-        
-        # Reduce font size for axis numbers and labels
-        sns.set_context("notebook", font_scale=0.5)  # Reduce font size to half for axis numbers and labels
-        
-        # Generate the pairplot
-        fig_pair = sns.pairplot(pivot_pair, vars=selected_pair_params, hue="Site", corner=True, height=2.5)  # Create pairplot
-
-        # Set y-axis label for the top-left subplot and ensure y-axis is visible
-        if fig_pair.axes is not None:
-            for i, param in enumerate(selected_pair_params):
-                if fig_pair.axes[i, 0] is not None:
-                    fig_pair.axes[i, 0].set_ylabel(param)  # Set y-axis label
-                    fig_pair.axes[i, 0].get_yaxis().set_visible(True)  # Ensure y-axis is visible
-                    fig_pair.axes[i, 0].spines['left'].set_visible(True)  # Ensure y-axis line is visible
-                    fig_pair.axes[i, 0].spines['left'].set_linewidth(1)   # Set y-axis line width (optional)
-                    fig_pair.axes[i, 0].spines['left'].set_color('black') # Set y-axis line color (optional)
-
-        # Display the pairplot
-        st.pyplot(fig_pair)                                                                # Show pairplot in app
+
+            # Reduce font size for axis numbers and labels
+            sns.set_context("notebook", font_scale=0.5)  # Reduce font size to half for axis numbers and labels
+
+            if len(pivot_pair) < DATASHADER_THRESHOLD:                                      # If the data is small
+                # Generate the pairplot
+                fig_pair = sns.pairplot(pivot_pair, vars=selected_pair_params, hue="Site", hue_order=sheet_pair, corner=True, height=2.5)  # Create pairplot
+
+                # Set y-axis label for the top-left subplot and ensure y-axis is visible
+                if fig_pair.axes is not None:
+                    for i, param in enumerate(selected_pair_params):
+                        if fig_pair.axes[i, 0] is not None:
+                            fig_pair.axes[i, 0].set_ylabel(param)  # Set y-axis label
+                            fig_pair.axes[i, 0].get_yaxis().set_visible(True)  # Ensure y-axis is visible
+                            fig_pair.axes[i, 0].spines['left'].set_visible(True)  # Ensure y-axis line is visible
+                            fig_pair.axes[i, 0].spines['left'].set_linewidth(1)   # Set y-axis line width (optional)
+                            fig_pair.axes[i, 0].spines['left'].set_color('black') # Set y-axis line color (optional)
+            else:                                                                           # If the data is large
+                fig_pair = datashader_pairplot(pivot_pair, selected_pair_params)            # Create rasterised pairplot
+
+            # Display the pairplot
+            st.pyplot(fig_pair)                                                            # Show pairplot in app
+            plt.close(fig_pair.figure)                                                     # Release the figure so reruns do not accumulate them
+        else:                                                                               # If the form was submitted with no parameters
+            st.warning("Please select at least one parameter for the pairplot.")           # Warn if not
     else:
-        st.warning("Please select at least one parameter for the pairplot.")               # Warn if not
+        st.warning("Please select two sheets to compare for the pairplot.")                # Warn if two sheets are not selected